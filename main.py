@@ -1,4 +1,7 @@
+from array import array
+from functools import lru_cache
 from time import perf_counter
+from pygame.locals import K_a, K_d, K_q, K_r, K_s, K_w
 import pygame
 import random
 import sys
@@ -19,12 +22,17 @@ COLOUR = {
 # Eg, a size of 899 produces lines when the square pos has been rounded
 WIN_WIDTH = 900
 
+FRAME_RATE = 66  # Frame rate cap
+
 DIFFICULTY = {
     'Simple': 5,
     'Regular': 10,
     'Complex': 15
 }
 
+# Scales each axis of diagonal movement so the overall speed is unchanged
+DIAGONAL_SCALE = 2 ** -0.5
+
 CONTROLS = ['[Q] - Back to menu',
             '[R] - Back to start',
             '[W,A,S,D] - To move',
@@ -35,100 +43,70 @@ win = pygame.display.set_mode((WIN_WIDTH, WIN_WIDTH))
 pygame.display.set_caption('Maze Game')
 
 
-class Square:
-    def __init__(self, game, x: float, y: float, colour: tuple) -> None:
-        self.x = x
-        self.y = y
-        self.colour = colour
-        self.rect = pygame.Rect(self.x, self.y, game.small_square, game.small_square)
-
-    def draw(self, game) -> None:
-        # Draws squares with offset to centre the maze in the window
-        pygame.draw.rect(win, self.colour, self.rect.move(game.offset, game.offset))
+@lru_cache(maxsize=None)
+def render_text(font: pygame.font.Font, text: str, colour: tuple) -> pygame.Surface:
+    # Rendered text never changes, so is reused when a menu is created again
+    return font.render(text, True, colour, COLOUR['Black'])
 
 
-class AdjacencyMatrix:
+class SpanningTree:
     def __init__(self, game) -> None:
-        # This creates an the adjacency matrix for the graph which is an n*n grid
-        # of vertices, where each vertices is connected to its neighbour. So there
-        # are n^2 vertices and n(2n-2) edges.
+        # The graph is an n*n grid of vertices, where each vertex is connected to
+        # its orthogonal neighbours. So there are n^2 vertices and n(2n-2) edges.
+        # The edges are implicit in the grid, so only need listing, not storing
+        # in a matrix
 
         self.vertex_across = game.squares_across
         self.vertex_total = game.squares_total
-        self.matrix = []  # Indexed [row][column]
-
-        # Creates empty matrix
-        for row in range(self.vertex_total):
-            self.matrix.append([0] * self.vertex_total)
-
-        # Fills in matrix
-        for vertex in range(self.vertex_total):
-            # Square to the left
-            adj_pos = vertex - 1
-            if adj_pos // self.vertex_across == vertex // self.vertex_across:  # Is on the same row
-                self.matrix[vertex][adj_pos] = 1
-
-            # Square to the right
-            adj_pos = vertex + 1
-            if adj_pos // self.vertex_across == vertex // self.vertex_across:  # Is on the same row
-                self.matrix[vertex][adj_pos] = 1
-
-            # Square above
-            adj_pos = vertex - self.vertex_across
-            if 0 <= adj_pos:  # Is a valid square
-                self.matrix[vertex][adj_pos] = 1
-
-            # Square below
-            adj_pos = vertex + self.vertex_across
-            if adj_pos < self.vertex_total:  # Is a valid square
-                self.matrix[vertex][adj_pos] = 1
-
-    def __str__(self) -> None:  # To output matrix to console
-        # Header row
-        output = '\n\t|\t'
-        for header in range(self.vertex_total):
-            output += str(header) + '\t'
-
-        # Separator row
-        output += '\n' + ('-' * 4 * (self.vertex_total + 2)) + '\n'
-
-        # Matrix data rows
-        for row, row_number in zip(self.matrix, range(self.vertex_total)):
-            output += str(row_number) + '\t|\t'
-            for element in row:
-                if element == 1:
-                    output += str(element) + '\t'
-                else:
-                    output += '\t'
-            output += '\n'
-
-        return output
-
-    def random_prims(self) -> None:
-        # The algorithm is based of the Prim's for an adjacency matrix, but chooses
-        # a random vertex coming from an already visited vertex instead of choosing
-        # based on edge weights. Unfortunately, the algorithm has a time complexity
-        # of O(V^2) even though Prim's is supposed to have O(E log V)
-
-        # Starts at vertex 0
-        visited_vertices = [0]
-        self.matrix[0] = [0] * self.vertex_total
-
-        # Keeps adding edges until every vertex has been visited
+
+        # Edges to the square to the right, then edges to the square below
+        self.edges = [(vertex, vertex + 1) for vertex in range(self.vertex_total)
+                      if (vertex + 1) % self.vertex_across]
+        self.edges += [(vertex, vertex + self.vertex_across)
+                       for vertex in range(self.vertex_total - self.vertex_across)]
+
+    def random_kruskals(self) -> None:
+        # Kruskal's algorithm on randomly ordered edges instead of edges sorted by
+        # weight. A union-find keeps track of which vertices are already joined,
+        # giving a time complexity of O(E a(V)), where a is the inverse Ackermann
+
+        # Each vertex starts in its own set
+        parent = list(range(self.vertex_total))
+        rank = [0] * self.vertex_total
+
+        def find(vertex: int) -> int:
+            # Follows parents up to the root of the set
+            root = vertex
+            while parent[root] != root:
+                root = parent[root]
+
+            # Path compression, points every vertex on the path at the root
+            while parent[vertex] != root:
+                parent[vertex], vertex = root, parent[vertex]
+
+            return root
+
+        random.shuffle(self.edges)
+
+        # Keeps adding edges until every vertex is in the tree
         self.edge_list = []  # Tuples in form (from, to)
-        for count in range(self.vertex_total - 1):
-            available_vertices = []
-            # Single line nested for loop approximately halves execution time
-            [[available_vertices.append((row, column)) if self.matrix[row][column] == 1 else
-              None for row in range(self.vertex_total)] for column in visited_vertices]
+        for edge in self.edges:
+            root_from, root_to = find(edge[0]), find(edge[1])
 
-            # Randomly chose an edge to add
-            chosen_edge = random.choice(available_vertices)
-            self.edge_list.append(chosen_edge)
+            # Edge would make a cycle
+            if root_from == root_to:
+                continue
 
-            # Clear the row corresponding to the 'to' vertex
-            self.matrix[chosen_edge[0]] = [0] * self.vertex_total
-            visited_vertices.append(chosen_edge[0])
+            # Union by rank, attaches the shorter tree under the taller one
+            if rank[root_from] < rank[root_to]:
+                root_from, root_to = root_to, root_from
+            parent[root_to] = root_from
+            if rank[root_from] == rank[root_to]:
+                rank[root_from] += 1
+
+            self.edge_list.append(edge)
+            if len(self.edge_list) == self.vertex_total - 1:
+                break
 
 
 class Game:
@@ -144,63 +122,83 @@ class Game:
         self.matrix_offset_list = [-self.squares_total, self.squares_total, -1, 1]  # Up, Down, Left, Right
 
         # Creates a randomised spanning tree to be the maze
-        self.matrix = AdjacencyMatrix(self)
-        self.matrix.random_prims()
+        self.spanning_tree = SpanningTree(self)
+        self.spanning_tree.random_kruskals()
+
+        # Creates the grid using the spanning tree
+        self.create_grid(self.spanning_tree.edge_list)
 
-        # Creates the grid using the matrix
-        self.create_grid(self.matrix.edge_list)
+        # Path never changes, so is drawn once and reused every frame
+        self.create_background()
 
-        # Creates player object
+        # Creates player object centred in the first square
         player_width = self.small_square / 4
         self.player_velocity = 7 * self.small_square  # Player velocity is relative to grid size
-        self.player = Player(self.path_squares[0].x + (self.small_square - player_width) / 2,
-                             self.path_squares[0].y + (self.small_square - player_width) / 2,
-                             player_width,
-                             self.player_velocity)
+        self.start_x = self.path_x[0] + (self.small_square - player_width) / 2
+        self.start_y = self.path_y[0] + (self.small_square - player_width) / 2
+        self.player = Player(self.start_x, self.start_y, player_width, self.player_velocity)
 
         # Time the player starts the maze
         self.start_time = perf_counter()
 
+        # Caps frame rate and measures frame times
+        self.clock = pygame.time.Clock()
+
         # Declaring attributes for later
         self.run, self.won, self.to_menu = True, False, False
 
     def create_grid(self, edge_list: list) -> None:
+        # Path squares are stored as separate arrays of x and y coordinates, as
+        # they are all the same size and colour apart from the end square
+
         # Creates a grid of base squares that are the same in every maze
-        self.path_squares = []
-        path_colour = COLOUR['Black']
+        self.path_x, self.path_y = array('d'), array('d')
         row, column = 0, 0
         for base_square in range(self.squares_total):
             if column == self.squares_across:
                 column = 0
                 row += 1
-            self.path_squares.append(Square(self,
-                                            row * self.base_square + self.small_square,
-                                            column * self.base_square + self.small_square,
-                                            path_colour))
+            self.path_x.append(row * self.base_square + self.small_square)
+            self.path_y.append(column * self.base_square + self.small_square)
             column += 1
 
         # Specifies end winning square
-        self.path_squares[-1].colour = COLOUR['Green']
-        self.end_square = self.path_squares[-1]
+        self.end_square = pygame.Rect(self.path_x[-1], self.path_y[-1], self.small_square, self.small_square)
 
-        # Joins base squares as specified by randomly generated matrix to make maze path
+        # Joins base squares as specified by randomly generated tree to make maze path
         for edge in edge_list:
-            path_square_x = 0.5 * (self.path_squares[edge[0]].x + self.path_squares[edge[1]].x)
-            path_square_y = 0.5 * (self.path_squares[edge[0]].y + self.path_squares[edge[1]].y)
-
-            self.path_squares.append(Square(self, path_square_x, path_square_y, path_colour))
+            self.path_x.append(0.5 * (self.path_x[edge[0]] + self.path_x[edge[1]]))
+            self.path_y.append(0.5 * (self.path_y[edge[0]] + self.path_y[edge[1]]))
+
+        # Path squares sit on a grid with a pitch of one small square, so a point
+        # can be checked against the path by which grid cell it falls in
+        self.path_cells = {self.grid_cell(square) for square in zip(self.path_x, self.path_y)}
+
+    def grid_cell(self, coordinate: tuple) -> tuple:
+        # Index of the small square grid cell the coordinate is in
+        return (int((coordinate[0] - self.small_square) // self.small_square),
+                int((coordinate[1] - self.small_square) // self.small_square))
+
+    def area_on_path(self, top_left: tuple, bot_right: tuple) -> bool:
+        # Every grid cell the area overlaps must be part of the path
+        first_column, first_row = self.grid_cell(top_left)
+        last_column, last_row = self.grid_cell(bot_right)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                if (column, row) not in self.path_cells:
+                    return False
+        return True
 
     def game_loop(self) -> None:
         # Set starting variables
-        self.time_last = perf_counter()
+        self.clock.tick()
         self.run = True
         pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_ARROW)
 
         # Loops until player reaching the end of the maze
         while self.run:
-            # Set frame rate cap of ~66fps
-            pygame.time.delay(15)
-            self.get_delta_time()
+            # Set frame rate cap and get elapsed time since last frame
+            self.delta_time = self.clock.tick(FRAME_RATE) / 1000
 
             # Skips exceptionally long frame times
             if self.delta_time > 0.06:
@@ -215,33 +213,25 @@ class Game:
             keys = pygame.key.get_pressed()
 
             # [Q] goes back to main menu
-            if keys[pygame.K_q]:
+            if keys[K_q]:
                 self.to_menu = True
                 self.run = False
             # [R] restart level with same maze
-            if keys[pygame.K_r]:
+            if keys[K_r]:
                 self.back_to_start()
 
             # Player movement
-            movement_vector = pygame.math.Vector2()
-            if keys[pygame.K_w]:  # Up
-                movement_vector.y -= 1
-            if keys[pygame.K_s]:  # Down
-                movement_vector.y += 1
-            if keys[pygame.K_d]:  # Right
-                movement_vector.x += 1
-            if keys[pygame.K_a]:  # Left
-                movement_vector.x -= 1
-            self.player.move(self, movement_vector)
+            movement_x = keys[K_d] - keys[K_a]  # Right, Left
+            movement_y = keys[K_s] - keys[K_w]  # Down, Up
+            self.player.move(self, (movement_x, movement_y))
 
             # Checks if player is in the end square
-            if self.end_square.rect.contains(self.player.rect):
+            if self.end_square.contains(self.player.rect):
                 self.won = True
                 self.run = False
 
             # Draws the frame
-            win.fill(COLOUR['Red'])
-            self.draw_path()
+            win.blit(self.background, (0, 0))
             self.player.draw(self)
             pygame.display.update()
 
@@ -249,26 +239,20 @@ class Game:
         self.time_taken = perf_counter() - self.start_time
 
     def back_to_start(self) -> None:
-        # Recreates player object at start of maze
-        del self.player
-        player_width = self.small_square / 4
-        self.player = Player(self.path_squares[0].x + (self.small_square - player_width) / 2,
-                             self.path_squares[0].y + (self.small_square - player_width) / 2,
-                             player_width,
-                             self.player_velocity)
+        # Moves player back to start of maze
+        self.player.reset(self.start_x, self.start_y)
 
         # Restart timer
         self.start_time = perf_counter()
 
-    def draw_path(self) -> None:
-        for square in self.path_squares:
-            square.draw(self)
-
-    def get_delta_time(self) -> None:
-        # Elapsed time since last frame
-        self.time_now = perf_counter()
-        self.delta_time = self.time_now - self.time_last
-        self.time_last = self.time_now
+    def create_background(self) -> None:
+        self.background = pygame.Surface((WIN_WIDTH, WIN_WIDTH))
+        self.background.fill(COLOUR['Red'])
+        # Draws squares with offset to centre the maze in the window
+        for square in zip(self.path_x, self.path_y):
+            square_rect = pygame.Rect(square, (self.small_square, self.small_square))
+            pygame.draw.rect(self.background, COLOUR['Black'], square_rect.move(self.offset, self.offset))
+        pygame.draw.rect(self.background, COLOUR['Green'], self.end_square.move(self.offset, self.offset))
 
 
 class Menu:
@@ -278,6 +262,9 @@ class Menu:
         self.create_buttons()
         self.create_controls()
 
+        # Caps frame rate
+        self.clock = pygame.time.Clock()
+
         # Initialising attributes for later
         self.exit, self.run_game = False, False
 
@@ -286,17 +273,22 @@ class Menu:
         self.button_origin_x = WIN_WIDTH // 2
         self.button_origin_y = WIN_WIDTH // 2.1
 
-        # Creates a rect for each button, used for blit and collisions
+        # Renders each button once in both colours, with a rect used for blit and collisions
         self.button_offset = MAIN_FONT.get_height() * 2
-        self.rect_list = []
-        difficulties_list = list(DIFFICULTY.keys())
-        for difficulty in range(len(DIFFICULTY)):
-            rect = MAIN_FONT.render(difficulties_list[difficulty], True, COLOUR['White']).get_rect()
-            rect.center = (self.button_origin_x, self.button_origin_y + (difficulty * self.button_offset))
-            self.rect_list.append(rect)
-
-    def create_title(self, text: str) -> None:
-        self.txt_title = TITLE_FONT.render(text, True, COLOUR['White'], COLOUR['Black'])
+        self.buttons = []
+        for index, (name, difficulty) in enumerate(DIFFICULTY.items()):
+            text = render_text(MAIN_FONT, name, COLOUR['White'])
+            text_hover = render_text(MAIN_FONT, name, COLOUR['Red'])
+            rect = text.get_rect()
+            rect.center = (self.button_origin_x, self.button_origin_y + (index * self.button_offset))
+            self.buttons.append((text, text_hover, rect, difficulty))
+
+    def create_title(self, text: str, cache: bool = True) -> None:
+        # Only fixed titles are cached, one off titles would just fill the cache
+        if cache:
+            self.txt_title = render_text(TITLE_FONT, text, COLOUR['White'])
+        else:
+            self.txt_title = TITLE_FONT.render(text, True, COLOUR['White'], COLOUR['Black'])
         self.rect_title = self.txt_title.get_rect()
         self.rect_title.center = (WIN_WIDTH // 2, WIN_WIDTH // 4)
 
@@ -304,15 +296,15 @@ class Menu:
         self.controls = []
         control_offset = CONTROLS_FONT.get_height()
         for control_index in range(len(CONTROLS)):
-            text = CONTROLS_FONT.render(CONTROLS[control_index], True, COLOUR['White'], COLOUR['Black'])
+            text = render_text(CONTROLS_FONT, CONTROLS[control_index], COLOUR['White'])
             rect = text.get_rect()
             rect.bottomleft = (control_offset, WIN_WIDTH - (2 * control_offset * control_index) - control_offset)
             self.controls.append([text, rect])
 
     def display_loop(self) -> None:
         while not (self.exit or self.run_game):
-            # Set frame rate cap of ~66fps
-            pygame.time.delay(15)
+            # Set frame rate cap
+            self.clock.tick(FRAME_RATE)
 
             # Gets mouse pos and state
             self.mouse_pos = pygame.mouse.get_pos()
@@ -331,8 +323,8 @@ class Menu:
             win.fill(COLOUR['Black'])
 
             # Displays all the buttons, detects mouse overs and clicks
-            for difficulty_index in range(len(DIFFICULTY)):
-                self.display_button(difficulty_index, self.rect_list[difficulty_index])
+            for button in self.buttons:
+                self.display_button(button)
 
             # Draws rest of frame
             win.blit(self.txt_title, self.rect_title)
@@ -350,29 +342,22 @@ class Menu:
         if self.run_game:
             pygame.mouse.set_cursor(pygame.SYSTEM_CURSOR_WAIT)
 
-    def display_button(self, difficulty_index: int, rect: pygame.Rect) -> None:
-        # Name of the difficulty
-        difficulty_str = list(DIFFICULTY.keys())[difficulty_index]
+    def display_button(self, button: tuple) -> None:
+        text, text_hover, rect, difficulty = button
 
         # Detects mouse over and clicking button
         if rect.collidepoint(self.mouse_pos):
             self.mouse_hovering = True
-            text = MAIN_FONT.render(difficulty_str, True, COLOUR['Red'], COLOUR['Black'])
-            rect = text.get_rect()
-            rect.center = (self.button_origin_x, self.button_origin_y + (difficulty_index * self.button_offset))
             pygame.draw.rect(win, COLOUR['Red'], rect, 10)
-            win.blit(text, rect)
+            win.blit(text_hover, rect)
 
             # Set difficulty to button currently hovering over
             if self.mouse_click:
-                self.difficulty = DIFFICULTY[difficulty_str]
+                self.difficulty = difficulty
                 self.run_game = True
 
         else:
             # Normal button render
-            text = MAIN_FONT.render(difficulty_str, True, COLOUR['White'], COLOUR['Black'])
-            rect = text.get_rect()
-            rect.center = (self.button_origin_x, self.button_origin_y + (difficulty_index * self.button_offset))
             win.blit(text, rect)
 
 
@@ -382,61 +367,54 @@ class EndScreen(Menu):
         super().__init__()
 
         # Only change is the text in the title
-        self.create_title(f'{round(time, 2)}s')
+        self.create_title(f'{round(time, 2)}s', cache=False)
 
 
 class Player:
+    __slots__ = ('pos', 'colour', 'width', 'collide_margin', 'corner_offsets', 'velocity', 'rect')
+
     def __init__(self, x: float, y: float, width: float, velocity: float) -> None:
         self.pos = (x, y)
         self.colour = COLOUR['White']
         self.width = width
         self.collide_margin = 1  # Hit box is slightly smaller than player
+        self.corner_offsets = (self.collide_margin, self.width - self.collide_margin)  # Top left, bottom right
         self.velocity = velocity
         self.rect = pygame.Rect(self.pos, (self.width, self.width))
 
+    def reset(self, x: float, y: float) -> None:
+        self.pos = (x, y)
+        self.update_player_rect(self.pos)
+
     def update_player_rect(self, coordinate: tuple) -> None:
-        self.rect = pygame.Rect(coordinate, (self.width, self.width))
+        # Truncated the same way as when the rect was created
+        self.rect.topleft = (int(coordinate[0]), int(coordinate[1]))
 
     def draw(self, game: Game) -> None:
         # Moved same offset as square grid to center maze
         pygame.draw.rect(win, self.colour, self.rect.move(game.offset, game.offset))
 
-    def move(self, game: Game, movement_vector: pygame.math.Vector2) -> None:
-        # Normalise vector to stop diagonal movement being faster
-        if not (movement_vector.magnitude() == 0 or movement_vector.magnitude() == 1):
-            movement_vector.normalize_ip()
+    def move(self, game: Game, movement: tuple) -> None:
+        movement_x, movement_y = movement
+
+        # Nothing to check when the player is not moving
+        if not (movement_x or movement_y):
+            return
+
+        # Normalise diagonal movement to stop it being faster
+        if movement_x and movement_y:
+            movement_x *= DIAGONAL_SCALE
+            movement_y *= DIAGONAL_SCALE
 
         # Projected position calculated to see if it would put the player off the path
-        next_x = self.pos[0] + (movement_vector.x * self.velocity * game.delta_time)
-        next_y = self.pos[1] + (movement_vector.y * self.velocity * game.delta_time)
+        next_x = self.pos[0] + (movement_x * self.velocity * game.delta_time)
+        next_y = self.pos[1] + (movement_y * self.velocity * game.delta_time)
         corners_for_x = self.gen_corners((next_x, self.pos[1]))
         corners_for_y = self.gen_corners((self.pos[0], next_y))
 
-        # List is all True if the player stays on the path
-        on_path_for_x = [False, False, False, False]
-        on_path_for_y = [False, False, False, False]
-        x_complete, y_complete = False, False
-
-        # Check if corners are on the path
-        for path_square in game.path_squares:
-            for corner in range(4):
-                # No need to do collisions, if all points have been verified
-                if not x_complete:
-                    # When a corner is on the path
-                    if path_square.rect.collidepoint(corners_for_x[corner]):
-                        on_path_for_x[corner] = True
-                    # When the entire player is on the path
-                    if on_path_for_x == [True, True, True, True]:
-                        x_complete = True
-
-                # No need to do collisions, if all points have been verified
-                if not y_complete:
-                    # When a corner is on the path
-                    if path_square.rect.collidepoint(corners_for_y[corner]):
-                        on_path_for_y[corner] = True
-                    # When the entire player is on the path
-                    if on_path_for_y == [True, True, True, True]:
-                        y_complete = True
+        # True if the entire hit box stays on the path
+        x_complete = game.area_on_path(*corners_for_x)
+        y_complete = game.area_on_path(*corners_for_y)
 
         # If no collision from x movement, finalise x plane
         if x_complete:
@@ -447,12 +425,10 @@ class Player:
 
         self.update_player_rect(self.pos)
 
-    def gen_corners(self, coordinate: tuple) -> list:
-        top_right = (coordinate[0] + self.collide_margin, coordinate[1] + self.collide_margin)
-        top_left = (coordinate[0] + self.width - self.collide_margin, coordinate[1] + self.collide_margin)
-        bot_left = (coordinate[0] + self.collide_margin, coordinate[1] + self.width - self.collide_margin)
-        bot_right = (coordinate[0] + self.width - self.collide_margin, coordinate[1] + self.width - self.collide_margin)
-        return [top_left, top_right, bot_left, bot_right]
+    def gen_corners(self, coordinate: tuple) -> tuple:
+        # Opposite corners of the hit box are enough to bound it
+        start, end = self.corner_offsets
+        return (coordinate[0] + start, coordinate[1] + start), (coordinate[0] + end, coordinate[1] + end)
 
 
 def main() -> None: